@@ -15,7 +15,8 @@ if __name__ == '__main__':
         db.session.add(user)
         db.session.commit()
 
-    kvoter.app.config["SECRET_KEY"] = ("I AM THE DEVELOPMENT SECRET KEY!"
-                                       "DO NOT COMMIT ME TO PRODUCTION")
+    if not kvoter.app.config.get("SECRET_KEY"):
+        kvoter.app.config["SECRET_KEY"] = ("I AM THE DEVELOPMENT SECRET KEY!"
+                                           "DO NOT COMMIT ME TO PRODUCTION")
     kvoter.app.config["DEBUG"] = True
     kvoter.app.run()
@@ -1,2 +1,5 @@
 from kvoter.app import app  # noqa
 from kvoter import routes  # noqa
+from kvoter import profiling
+
+profiling.install_hooks()
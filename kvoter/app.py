@@ -1,3 +1,4 @@
 from flask import Flask
 
 app = Flask(__name__)
+app.config.from_envvar('KVOTER_SETTINGS', silent=True)
@@ -1,9 +1,11 @@
 from datetime import datetime
 from sqlalchemy.orm.exc import NoResultFound
 from kvoter.app import app
+from kvoter.leaderboard import leaderboard
 from flask.ext.sqlalchemy import SQLAlchemy
 from flask.ext.login import UserMixin
 import hashlib
+import threading
 from random import choice
 from string import ascii_letters, digits
 
@@ -11,6 +13,8 @@ app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///kvoter.db"
 
 db = SQLAlchemy(app)
 
+_leaderboard_load_lock = threading.Lock()
+
 roles_users = db.Table(
     'user_roles',
     db.Column('user_id', db.Integer(), db.ForeignKey('users.id')),
@@ -41,6 +45,16 @@ class Candidate(db.Model):
             candidate = Candidate(user_id, election_id)
             db.session.add(candidate)
             db.session.commit()
+            if leaderboard.loaded:
+                name = db.session.query(User.name).filter(
+                    User.id == user_id
+                ).scalar()
+                try:
+                    leaderboard.add_candidate(election_id, name)
+                except KeyError:
+                    # The election is not loaded here; refresh_leaderboard()
+                    # picks the row up if the election exists.
+                    pass
             return candidate
 
 
@@ -67,6 +81,13 @@ class Voter(db.Model):
             voter = Voter(user_id, election_id)
             db.session.add(voter)
             db.session.commit()
+            if leaderboard.loaded:
+                try:
+                    leaderboard.add_pledge(election_id)
+                except KeyError:
+                    # The election is not loaded here; refresh_leaderboard()
+                    # picks the row up if the election exists.
+                    pass
             return voter
 
 
@@ -141,6 +162,9 @@ class Election(db.Model):
                                 date_of_vote)
             db.session.add(election)
             db.session.commit()
+            if leaderboard.loaded:
+                leaderboard.add_election(election.id, election_type,
+                                         location)
             return election
 
 
@@ -231,3 +255,40 @@ class User(db.Model, UserMixin):
             db.session.add(user)
             db.session.commit()
             return user
+
+
+def load_leaderboard():
+    leaderboard.load(
+        elections=db.session.query(Election.id, Election.election_type,
+                                   Election.location),
+        candidates=db.session.query(Candidate.user_id,
+                                    Candidate.election_id),
+        voters=db.session.query(Voter.election_id,
+                                db.func.count(Voter.id)).group_by(
+                                    Voter.election_id),
+        users=db.session.query(User.id, User.name).join(
+            Candidate, Candidate.user_id == User.id).distinct(),
+    )
+
+
+def leaderboard_signature():
+    # Only count rows for elections that exist, as the leaderboard skips
+    # the others when it loads.
+    return tuple(db.session.query(
+        db.session.query(db.func.count(Election.id)).as_scalar(),
+        db.session.query(db.func.count(Candidate.id)).join(
+            Election, Candidate.election_id == Election.id).as_scalar(),
+        db.session.query(db.func.count(Voter.id)).join(
+            Election, Voter.election_id == Election.id).as_scalar(),
+    ).one())
+
+
+def refresh_leaderboard():
+    # Rows written by other workers or scripts change the counts, so compare
+    # them with what this process holds and reload if they differ.
+    signature = leaderboard_signature()
+    if leaderboard.loaded and leaderboard.signature() == signature:
+        return
+    with _leaderboard_load_lock:
+        if not leaderboard.loaded or leaderboard.signature() != signature:
+            load_leaderboard()
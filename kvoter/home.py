@@ -1,6 +1,7 @@
 from flask import render_template, request
 from kvoter import app
-from kvoter.db import Election, Candidate, User
+from kvoter.db import refresh_leaderboard
+from kvoter.leaderboard import leaderboard
 from wtforms import Form, IntegerField, validators
 
 
@@ -17,22 +18,11 @@ class VoteForm(Form):
 def home_view():
     form = VoteForm(request.form)
 
-    candidates = Candidate.query.all()
-    elections = Election.query.all()
-    users = {
-        user.id: user
-        for user in User.query.all()
-    }
-    elections = [
-        {
-            'type': election.election_type,
-            'location': election.location,
-            'candidates': [users[candidate.user_id]
-                           for candidate in candidates
-                           if candidate.election_id == election.id],
-        }
-        for election in elections
-    ]
+    refresh_leaderboard()
+    if app.config.get('LEADERBOARD_SIZE'):
+        elections = leaderboard.top_elections(app.config['LEADERBOARD_SIZE'])
+    else:
+        elections = leaderboard.elections()
 
     if request.method == 'POST' and form.validate():
         pass
@@ -0,0 +1,241 @@
+from array import array
+from bisect import bisect_left
+import threading
+
+
+class SortedIndex(object):
+    """Map integer keys to integer values using two sorted arrays."""
+    __slots__ = ('keys', 'values')
+
+    def __init__(self, pairs=()):
+        pairs = sorted(pairs)
+        self.keys = array('i', [key for key, _ in pairs])
+        self.values = array('i', [value for _, value in pairs])
+
+    def __contains__(self, key):
+        index = bisect_left(self.keys, key)
+        return index < len(self.keys) and self.keys[index] == key
+
+    def get(self, key):
+        index = bisect_left(self.keys, key)
+        if index < len(self.keys) and self.keys[index] == key:
+            return self.values[index]
+        raise KeyError(key)
+
+    def add(self, key, value):
+        # Keys come from autoincrementing ids, so this is nearly always an
+        # append to the end of the arrays.
+        index = bisect_left(self.keys, key)
+        if index < len(self.keys) and self.keys[index] == key:
+            self.values[index] = value
+        else:
+            self.keys.insert(index, key)
+            self.values.insert(index, value)
+
+
+def _add_name(buffer, name):
+    if buffer:
+        buffer.append(0)
+    buffer.extend((name or '').encode('utf8'))
+
+
+def _split_names(buffer):
+    if not buffer:
+        return []
+    return buffer.decode('utf8').split('\0')
+
+
+class Leaderboard(object):
+    """Compact read model of elections, candidates and pledges.
+
+    Elections are held in parallel arrays indexed by slot, in the order they
+    were added. Each election's candidate names are kept as one utf8 buffer
+    separated by NUL bytes, so a row is rendered with a single decode and
+    split. For 100k candidates with ten character names this is about
+    1.2MB, plus roughly 120 bytes per election for its arrays and strings.
+
+    Slots are also kept ordered by pledges, and since a pledge only ever
+    adds one, each pledge moves its election with a binary search and a
+    swap. Rendered rows are cached until the next change, and the split
+    candidate names of each rendered election until it gains a candidate,
+    so a pledge only costs rebuilding the row dicts.
+
+    load() builds fresh structures and swaps them in under a lock, so
+    readers never see a half built leaderboard. Each process loads its own
+    copy on first use; kvoter.db.refresh_leaderboard() reloads it when
+    signature() no longer matches the database.
+    """
+    __slots__ = (
+        'lock',
+        'loaded',
+        'cache',
+        'name_cache',
+        'election_index',
+        'election_ids',
+        'election_types',
+        'election_locations',
+        'election_pledges',
+        'election_candidates',
+        'order',
+        'rank',
+        'candidate_count',
+        'pledge_count',
+    )
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.load([], [], [], [])
+        self.loaded = False
+
+    def load(self, elections, candidates, voters, users):
+        """Build the leaderboard from bulk query rows.
+
+        elections: (id, election_type, location) rows
+        candidates: (user_id, election_id) rows
+        voters: (election_id, pledges) rows
+        users: (id, name) rows
+
+        Candidate and voter rows for unknown elections are ignored and not
+        counted in signature().
+        """
+        elections = sorted(elections)
+        election_ids = array('i', [row[0] for row in elections])
+        election_types = [row[1] for row in elections]
+        election_locations = [row[2] for row in elections]
+        election_index = SortedIndex(
+            (election_id, slot)
+            for slot, election_id in enumerate(election_ids)
+        )
+        election_pledges = array('i', [0]) * len(election_ids)
+        election_candidates = [bytearray() for _ in election_ids]
+        names = dict(users)
+        candidate_count = 0
+        pledge_count = 0
+
+        for election_id, pledges in voters:
+            try:
+                slot = election_index.get(election_id)
+            except KeyError:
+                continue
+            election_pledges[slot] = pledges
+            pledge_count += pledges
+        for user_id, election_id in candidates:
+            try:
+                slot = election_index.get(election_id)
+            except KeyError:
+                continue
+            _add_name(election_candidates[slot], names.get(user_id))
+            candidate_count += 1
+
+        # Stable sort, so elections with equal pledges stay in id order
+        order = array('i', sorted(range(len(election_ids)),
+                                  key=election_pledges.__getitem__,
+                                  reverse=True))
+        rank = array('i', [0]) * len(order)
+        for position, slot in enumerate(order):
+            rank[slot] = position
+
+        with self.lock:
+            self.election_index = election_index
+            self.election_ids = election_ids
+            self.election_types = election_types
+            self.election_locations = election_locations
+            self.election_pledges = election_pledges
+            self.election_candidates = election_candidates
+            self.order = order
+            self.rank = rank
+            self.candidate_count = candidate_count
+            self.pledge_count = pledge_count
+            self.cache = {}
+            self.name_cache = {}
+            self.loaded = True
+
+    def signature(self):
+        """Return (elections, candidates, pledges) counts held in memory."""
+        with self.lock:
+            return (len(self.election_ids), self.candidate_count,
+                    self.pledge_count)
+
+    def add_election(self, election_id, election_type, location):
+        with self.lock:
+            if election_id in self.election_index:
+                return
+            slot = len(self.election_ids)
+            self.election_index.add(election_id, slot)
+            self.election_ids.append(election_id)
+            self.election_types.append(election_type)
+            self.election_locations.append(location)
+            self.election_pledges.append(0)
+            self.election_candidates.append(bytearray())
+            # No pledges yet, so it belongs at the end of the order
+            self.rank.append(len(self.order))
+            self.order.append(slot)
+            self.cache = {}
+
+    def add_candidate(self, election_id, name):
+        """Add a candidate, raising KeyError if the election is unknown."""
+        with self.lock:
+            slot = self.election_index.get(election_id)
+            _add_name(self.election_candidates[slot], name)
+            self.candidate_count += 1
+            self.cache = {}
+            self.name_cache.pop(slot, None)
+
+    def add_pledge(self, election_id):
+        """Add a pledge, raising KeyError if the election is unknown."""
+        with self.lock:
+            slot = self.election_index.get(election_id)
+            pledges = self.election_pledges[slot]
+            position = self.rank[slot]
+            # Find the first election with as few pledges as this one and
+            # swap with it; everything before it still has more pledges.
+            low, high = 0, position
+            while low < high:
+                middle = (low + high) // 2
+                if self.election_pledges[self.order[middle]] > pledges:
+                    low = middle + 1
+                else:
+                    high = middle
+            other = self.order[low]
+            self.order[low], self.order[position] = slot, other
+            self.rank[slot], self.rank[other] = low, position
+            self.election_pledges[slot] = pledges + 1
+            self.pledge_count += 1
+            self.cache = {}
+
+    def _row(self, slot):
+        if slot not in self.name_cache:
+            self.name_cache[slot] = _split_names(
+                self.election_candidates[slot]
+            )
+        return {
+            'id': self.election_ids[slot],
+            'type': self.election_types[slot],
+            'location': self.election_locations[slot],
+            'pledges': self.election_pledges[slot],
+            'candidates': self.name_cache[slot],
+        }
+
+    def elections(self):
+        """Return election dicts for every election, in id order.
+
+        The list is cached until the next change and must not be modified.
+        """
+        with self.lock:
+            if None not in self.cache:
+                self.cache[None] = [self._row(slot)
+                                    for slot in self.election_index.values]
+            return self.cache[None]
+
+    def top_elections(self, n):
+        """Return election dicts for the n elections with most pledges.
+
+        The list is cached until the next change and must not be modified.
+        """
+        with self.lock:
+            if n not in self.cache:
+                self.cache[n] = [self._row(slot) for slot in self.order[:n]]
+            return self.cache[n]
+
+
+leaderboard = Leaderboard()
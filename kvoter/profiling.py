@@ -0,0 +1,151 @@
+from flask import request, g
+from kvoter.app import app
+from kvoter.auth import generate_hmac
+import cProfile
+import hmac
+import glob
+import os
+import pstats
+import random
+import threading
+import time
+import uuid
+
+PROFILE_HEADER = 'X-Kvoter-Profile'
+
+
+def install_hooks():
+    """Install per-request profiling hooks if enabled in the app config.
+
+    PROFILE_ALWAYS: profile every request
+    PROFILE_TOKENS: profile requests carrying an unexpired token from
+                    profile_token() in the X-Kvoter-Profile header
+    PROFILE_TOKEN_TTL: seconds a new token stays valid, defaults to 3600
+    PROFILE_SAMPLE_RATE: fraction of requests to profile, from 0 to 1
+    PROFILE_DIR: where to write the profiles, defaults to 'profiles'
+    PROFILE_MAX_FILES: profiles to keep, oldest are removed first,
+                       defaults to 1000
+
+    No hooks are registered when none of these modes are set, so requests
+    pay nothing when profiling is off.
+    """
+    if not (app.config.get('PROFILE_ALWAYS') or
+            app.config.get('PROFILE_TOKENS') or
+            app.config.get('PROFILE_SAMPLE_RATE')):
+        return
+
+    def should_profile():
+        if app.config.get('PROFILE_ALWAYS'):
+            return True
+        token = request.headers.get(PROFILE_HEADER)
+        if (app.config.get('PROFILE_TOKENS') and token and
+                validate_profile_token(request.path, token)):
+            return True
+        rate = app.config.get('PROFILE_SAMPLE_RATE') or 0
+        return random.random() < rate
+
+    @app.before_request
+    def start_profile():
+        if should_profile():
+            g.profiler = cProfile.Profile()
+            g.profiler.enable()
+
+    @app.teardown_request
+    def stop_profile(exception=None):
+        profiler = getattr(g, 'profiler', None)
+        if profiler is None:
+            return
+        profiler.disable()
+        g.profiler = None
+        directory = app.config.get('PROFILE_DIR', 'profiles')
+        name = '%s-%d-%d-%d-%s.prof' % (
+            request.endpoint or 'unknown',
+            int(time.time() * 1000),
+            os.getpid(),
+            threading.get_ident(),
+            uuid.uuid4().hex,
+        )
+        path = os.path.join(directory, name)
+        try:
+            if not os.path.isdir(directory):
+                os.makedirs(directory)
+            # Write under a name hottest() ignores, then move it into place
+            # so readers never see a partial profile.
+            profiler.dump_stats(path + '.tmp')
+            os.rename(path + '.tmp', path)
+            prune(directory, app.config.get('PROFILE_MAX_FILES', 1000))
+        except (IOError, OSError):
+            app.logger.exception('Could not write profile %s' % path)
+
+
+def prune(directory, max_files):
+    paths = glob.glob(os.path.join(directory, '*.prof'))
+    if len(paths) <= max_files:
+        return
+    aged = []
+    for path in paths:
+        try:
+            aged.append((os.path.getmtime(path), path))
+        except OSError:
+            # Already removed by another worker
+            pass
+    aged.sort()
+    for _, path in aged[:len(aged) - max_files]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def profile_token(path, expires=None):
+    if expires is None:
+        expires = int(time.time()) + app.config.get('PROFILE_TOKEN_TTL', 3600)
+    return '%d:%s' % (
+        expires,
+        generate_hmac('profile:%s:%d' % (path, expires)),
+    )
+
+
+def validate_profile_token(path, token):
+    try:
+        expires, digest = token.split(':', 1)
+        expires = int(expires)
+    except ValueError:
+        return False
+    if expires < time.time():
+        return False
+    try:
+        return hmac.compare_digest(
+            generate_hmac('profile:%s:%d' % (path, expires)),
+            digest,
+        )
+    except TypeError:
+        return False
+
+
+def hottest(directory, endpoint=None, sort='cumulative', limit=20):
+    """Print the hottest functions across all profiles in directory.
+
+    Profiles are plain cProfile dumps, so they can also be opened one at a
+    time with standard viewers such as snakeviz or pstats. Files that
+    cannot be read are reported and skipped.
+    """
+    pattern = '%s-*.prof' % endpoint if endpoint else '*.prof'
+    stats = None
+    loaded = 0
+    for path in sorted(glob.glob(os.path.join(directory, pattern))):
+        try:
+            if stats is None:
+                stats = pstats.Stats(path)
+            else:
+                stats.add(path)
+        except (EOFError, ValueError, TypeError, IOError, OSError):
+            print('Skipping unreadable profile %s' % path)
+            continue
+        loaded += 1
+    if stats is None:
+        print('No profiles found in %s' % directory)
+        return None
+    print('Aggregated %d profiles' % loaded)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return stats
@@ -1,10 +1,11 @@
 # Set the path
 import os
 import sys
+import time
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from flask.ext.script import Manager, Server
-from kvoter import app
+from kvoter import app, profiling
 
 manager = Manager(app)
 
@@ -15,5 +16,38 @@ manager.add_command("runserver", Server(
     host='0.0.0.0')
 )
 
+
+@manager.option('-d', '--directory', dest='directory', default=None,
+                help='Directory holding the .prof files')
+@manager.option('-e', '--endpoint', dest='endpoint', default=None,
+                help='Only aggregate profiles of this endpoint, e.g. me')
+@manager.option('-s', '--sort', dest='sort', default='cumulative',
+                help='pstats sort key, e.g. cumulative or tottime')
+@manager.option('-l', '--limit', dest='limit', default=20, type=int,
+                help='Number of functions to show')
+def profile_stats(directory, endpoint, sort, limit):
+    """Show the hottest functions across captured request profiles"""
+    profiling.hottest(
+        directory or app.config.get('PROFILE_DIR', 'profiles'),
+        endpoint=endpoint,
+        sort=sort,
+        limit=limit,
+    )
+
+
+@manager.option('path', help='Request path to profile, e.g. /me')
+@manager.option('-t', '--ttl', dest='ttl', default=None, type=int,
+                help='Seconds the token stays valid')
+def profile_token(path, ttl):
+    """Print a token for the X-Kvoter-Profile header"""
+    if not app.config.get('SECRET_KEY'):
+        print('SECRET_KEY must be set in the KVOTER_SETTINGS config file')
+        return
+    expires = None
+    if ttl is not None:
+        expires = int(time.time()) + ttl
+    print(profiling.profile_token(path, expires))
+
+
 if __name__ == "__main__":
     manager.run()
@@ -0,0 +1,80 @@
+import unittest
+
+from kvoter.leaderboard import Leaderboard
+
+
+class TestLeaderboard(unittest.TestCase):
+    def setUp(self):
+        self.leaderboard = Leaderboard()
+        self.leaderboard.load(
+            elections=[(3, 'Mayor', 'Leeds'), (1, 'MP', 'York')],
+            candidates=[(10, 1), (11, 3), (12, 1)],
+            voters=[(3, 5), (1, 2)],
+            users=[(10, 'alice'), (11, 'bob'), (12, 'carol')],
+        )
+
+    def test_load_out_of_order_rows(self):
+        self.assertEqual(list(self.leaderboard.election_ids), [1, 3])
+        self.assertEqual(self.leaderboard.signature(), (2, 3, 7))
+        york = self.leaderboard.top_elections(2)[1]
+        self.assertEqual(york['location'], 'York')
+        self.assertEqual(york['pledges'], 2)
+        self.assertEqual(york['candidates'], ['alice', 'carol'])
+
+    def test_load_skips_orphan_rows(self):
+        self.leaderboard.load(
+            elections=[(1, 'MP', 'York')],
+            candidates=[(10, 1), (11, 99)],
+            voters=[(1, 2), (99, 4)],
+            users=[(10, 'alice'), (11, 'bob')],
+        )
+        self.assertEqual(self.leaderboard.signature(), (1, 1, 2))
+
+    def test_elections_in_id_order(self):
+        self.leaderboard.add_pledge(1)
+        elections = self.leaderboard.elections()
+        self.assertEqual([election['id'] for election in elections], [1, 3])
+        self.assertEqual(elections[1]['candidates'], ['bob'])
+
+    def test_top_elections_ordering(self):
+        self.leaderboard.add_election(2, 'Council', 'Hull')
+        for _ in range(9):
+            self.leaderboard.add_pledge(2)
+        top = self.leaderboard.top_elections(2)
+        self.assertEqual([election['id'] for election in top], [2, 3])
+        self.assertEqual(len(self.leaderboard.top_elections(10)), 3)
+
+    def test_pledges_reorder_ties(self):
+        self.leaderboard.load(
+            elections=[(1, 'MP', 'York'), (2, 'MP', 'Hull'),
+                       (3, 'MP', 'Leeds')],
+            candidates=[],
+            voters=[],
+            users=[],
+        )
+        self.leaderboard.add_pledge(3)
+        self.leaderboard.add_pledge(2)
+        self.leaderboard.add_pledge(2)
+        top = self.leaderboard.top_elections(3)
+        self.assertEqual([election['id'] for election in top], [2, 3, 1])
+        self.assertEqual([election['pledges'] for election in top],
+                         [2, 1, 0])
+
+    def test_add_candidate_new_user(self):
+        self.leaderboard.add_candidate(3, 'dave')
+        self.assertEqual(self.leaderboard.top_elections(1)[0]['candidates'],
+                         ['bob', 'dave'])
+
+    def test_add_candidate_unknown_election(self):
+        with self.assertRaises(KeyError):
+            self.leaderboard.add_candidate(99, 'dave')
+        self.assertEqual(self.leaderboard.signature(), (2, 3, 7))
+
+    def test_add_pledge_unknown_election(self):
+        with self.assertRaises(KeyError):
+            self.leaderboard.add_pledge(99)
+        self.assertEqual(self.leaderboard.signature(), (2, 3, 7))
+
+
+if __name__ == '__main__':
+    unittest.main()
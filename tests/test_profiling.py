@@ -0,0 +1,92 @@
+import cProfile
+import io
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from contextlib import redirect_stdout
+
+from kvoter import app, profiling
+
+
+class TestProfileToken(unittest.TestCase):
+    def setUp(self):
+        self.secret_key = app.config.get('SECRET_KEY')
+        app.config['SECRET_KEY'] = 'test secret'
+
+    def tearDown(self):
+        app.config['SECRET_KEY'] = self.secret_key
+
+    def test_valid_token(self):
+        token = profiling.profile_token('/me')
+        self.assertTrue(profiling.validate_profile_token('/me', token))
+
+    def test_expired_token(self):
+        token = profiling.profile_token('/me', int(time.time()) - 1)
+        self.assertFalse(profiling.validate_profile_token('/me', token))
+
+    def test_wrong_path(self):
+        token = profiling.profile_token('/me')
+        self.assertFalse(profiling.validate_profile_token('/login', token))
+
+    def test_tampered_digest(self):
+        expires, digest = profiling.profile_token('/me').split(':')
+        tampered = '%s:%s' % (expires, digest[::-1])
+        self.assertFalse(profiling.validate_profile_token('/me', tampered))
+
+    def test_tampered_expiry(self):
+        expires, digest = profiling.profile_token('/me').split(':')
+        tampered = '%d:%s' % (int(expires) + 3600, digest)
+        self.assertFalse(profiling.validate_profile_token('/me', tampered))
+
+    def test_malformed_tokens(self):
+        for token in ('', 'nonsense', 'soon:abc', '1:2:3', ':'):
+            self.assertFalse(profiling.validate_profile_token('/me', token))
+
+
+class TestHottest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def dump(self, name):
+        profiler = cProfile.Profile()
+        profiler.enable()
+        sorted(range(1000), reverse=True)
+        profiler.disable()
+        profiler.dump_stats(os.path.join(self.directory, name))
+
+    def hottest(self, **kwargs):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            stats = profiling.hottest(self.directory, **kwargs)
+        return stats, output.getvalue()
+
+    def test_aggregates_profiles(self):
+        self.dump('me-1.prof')
+        self.dump('me-2.prof')
+        self.dump('login-1.prof')
+        stats, output = self.hottest(endpoint='me')
+        self.assertIn('Aggregated 2 profiles', output)
+        self.assertIn('sorted', output)
+        self.assertEqual(len(stats.files), 2)
+
+    def test_skips_unreadable_profiles(self):
+        self.dump('me-1.prof')
+        with open(os.path.join(self.directory, 'me-2.prof'), 'wb') as f:
+            f.write(b'not a profile')
+        stats, output = self.hottest()
+        self.assertIn('Skipping unreadable profile', output)
+        self.assertIn('Aggregated 1 profiles', output)
+
+    def test_no_profiles(self):
+        stats, output = self.hottest()
+        self.assertIsNone(stats)
+        self.assertIn('No profiles found', output)
+
+
+if __name__ == '__main__':
+    unittest.main()